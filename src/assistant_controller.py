@@ -2,8 +2,11 @@
 assistant controller
 """
 
-from difflib import get_close_matches
+import sys
+from bisect import bisect_left
+from functools import lru_cache
 from prompt_toolkit.completion import Completer, Completion
+from rapidfuzz import fuzz, process
 from src.models.address_book import AddressBook
 from src.book_controller import (
     add_contact,
@@ -47,7 +50,7 @@ COMMANDS = {
     "find-notes": find_notes_by_keyword,
     "exit": "",
     "close": "",
-    "hello": "",
+    "hello": lambda args, book: "How can I help you?",
     "cls": "",
     "clear": "",
     "add-email": add_email,
@@ -59,21 +62,64 @@ COMMANDS = {
     "show-all-tags": show_all_sorted_tags,
     "show-all-notes-by-tags": show_all_notes_sorted_by_tags,
 }
+# Interned keys let lookups with interned parsed commands match by identity
+COMMANDS = {sys.intern(name): handler for name, handler in COMMANDS.items()}
 
+# Command names computed once for the suggestion and completion lookups
+_COMMAND_NAMES = tuple(COMMANDS.keys())
+# Sorted copy for prefix lookups with bisect
+_SORTED_COMMAND_NAMES = tuple(sorted(_COMMAND_NAMES))
 
+
+@lru_cache(maxsize=256)
 def suggest_command(command, available_commands):
     """
     Suggest the closest matching command based on user input.
 
     Args:
         command (str): The command to match.
-        available_commands (list): List of available command strings.
+        available_commands (tuple): Available command strings. Must be
+            hashable, since results are cached per (command, commands) pair.
 
     Returns:
         str: The closest matching command.
     """
-    matches = get_close_matches(command, available_commands, n=1, cutoff=0.6)
-    return matches[0] if matches else None
+    # fuzz.ratio is an Indel (LCS) similarity, not difflib's Ratcliff/Obershelp
+    # ratio, so borderline inputs can get a different suggestion than before
+    match = process.extractOne(
+        command, available_commands, scorer=fuzz.ratio, score_cutoff=60
+    )
+    return match[0] if match else None
+
+
+@lru_cache(maxsize=256)
+def complete_command(prefix: str) -> tuple:
+    """
+    Find the commands closest to the partially typed command.
+
+    Commands starting with the typed text are found by binary search in the
+    sorted command names; fuzzy matching is used only when there are none.
+
+    Args:
+        prefix (str): The lowercased text typed so far.
+
+    Returns:
+        tuple: The commands starting with the prefix, or up to five closest
+            command names.
+    """
+    prefix_matches = []
+    start = bisect_left(_SORTED_COMMAND_NAMES, prefix)
+    for name in _SORTED_COMMAND_NAMES[start:]:
+        if not name.startswith(prefix):
+            break
+        prefix_matches.append(name)
+    if prefix_matches:
+        return tuple(prefix_matches)
+
+    matches = process.extract(
+        prefix, _COMMAND_NAMES, scorer=fuzz.ratio, limit=5, score_cutoff=10
+    )
+    return tuple(match for match, _, _ in matches)
 
 
 class CommandCompleter(Completer):
@@ -115,10 +161,7 @@ class CommandCompleter(Completer):
 
         # Only suggest completions for the first word (command)
         if len(words) == 1 and " " not in text_before_cursor:
-            matches = get_close_matches(
-                words[0].lower(), COMMANDS.keys(), n=5, cutoff=0.1
-            )
-            for match in matches:
+            for match in complete_command(words[0].lower()):
                 yield Completion(match, start_position=-len(words[0]))
 
 
@@ -135,16 +178,12 @@ def execute_command(command: str, args: list, book: AddressBook) -> str:
         str: The result of the command execution.
     """
 
-    match command:
-        case "hello":
-            return "How can I help you?"
-
-        case command if command in COMMANDS:
-            return COMMANDS[command](args, book)
+    handler = COMMANDS.get(command)
+    if handler is not None:
+        return handler(args, book)
 
-        case _:
-            suggested_command = suggest_command(command, list(COMMANDS.keys()))
-            if suggested_command:
-                return f"Invalid command. Did you mean '{suggested_command}'?"
+    suggested_command = suggest_command(command, _COMMAND_NAMES)
+    if suggested_command:
+        return f"Invalid command. Did you mean '{suggested_command}'?"
 
-            return "Invalid command."
+    return "Invalid command."
@@ -2,10 +2,14 @@
 book controller
 """
 
-import pickle
+import gzip
 import os
+import sys
+from functools import lru_cache, wraps
+from itertools import chain
+from operator import itemgetter
 from typing import Callable, List, Tuple
-from tabulate import tabulate
+import msgpack
 
 from src.models.address_book import AddressBook, Record
 from src.models.fields import (
@@ -17,6 +21,20 @@ from src.models.fields import (
     NoteValueError,
 )
 
+# Asks the user a question and returns the answer. main replaces it with a
+# prompt_toolkit session so the terminal is not switched back to input() mode.
+ask: Callable[[str], str] = input
+
+# Validation errors whose message is shown to the user as the command result
+USER_ERRORS = (
+    PhoneNumberValueError,
+    BirthdayValueError,
+    NameValueError,
+    EmailValueError,
+    AddressValueError,
+    NoteValueError,
+)
+
 
 def input_error(func: Callable) -> Callable:
     """
@@ -29,17 +47,11 @@ def input_error(func: Callable) -> Callable:
         Callable: The wrapped function with error handling.
     """
 
+    @wraps(func)
     def inner(*args, **kwargs):
         try:
             return func(*args, **kwargs)
-        except (
-            PhoneNumberValueError,
-            BirthdayValueError,
-            NameValueError,
-            EmailValueError,
-            AddressValueError,
-            NoteValueError,
-        ) as e:
+        except USER_ERRORS as e:
             return e
         except ValueError as e:
             return e
@@ -49,6 +61,11 @@ def input_error(func: Callable) -> Callable:
     return inner
 
 
+# Commands whose last argument is free text, mapped to their argument count.
+# The text is returned as one argument with its spacing kept.
+FREE_TEXT_COMMANDS = {"add-note": 3, "edit-note": 3, "add-address": 2}
+
+
 def parse_input(user_input: str) -> Tuple[str, List[str]]:
     """
     Parse user input into a command and its arguments.
@@ -57,23 +74,97 @@ def parse_input(user_input: str) -> Tuple[str, List[str]]:
         user_input (str): The raw input from the user.
 
     Returns:
-        Tuple[str, List[str]]: The command and list of arguments.
+        Tuple[str, List[str]]: The command and list of arguments. The command
+            is interned and is an empty string for blank input.
+    """
+    parts = user_input.strip().split(maxsplit=1)
+    if not parts:
+        return "", []
+    cmd = sys.intern(parts[0].lower())
+    if len(parts) == 1:
+        return cmd, []
+    arg_count = FREE_TEXT_COMMANDS.get(cmd)
+    if arg_count is None:
+        return cmd, parts[1].split()
+    # Split off the arguments before the text, the rest stays as it was typed
+    return cmd, parts[1].split(maxsplit=arg_count - 1)
+
+
+# Moves the cursor home and clears the screen and the scrollback
+CLEAR_SEQUENCE = "\x1b[H\x1b[2J\x1b[3J"
+
+
+@lru_cache(maxsize=None)
+def enable_ansi_escapes() -> bool:
+    """
+    Make sure the terminal handles ANSI escape sequences. Runs once.
+
+    Returns:
+        bool: True if escape sequences can be written to stdout.
     """
-    cmd, *args = user_input.split()
-    cmd = cmd.strip().lower()
-    return cmd, args
+    # macOS and Linux terminals support them natively
+    if os.name != "nt":
+        return True
+    # Windows 10+ consoles support them once virtual terminal processing is on
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (AttributeError, OSError):
+        return False
 
 
 def clear_screen():
     """
     Clear screen
     """
-    # For Windows
-    if os.name == "nt":
-        os.system("cls")
-    # For macOS and Linux
+    if enable_ansi_escapes():
+        sys.stdout.write(CLEAR_SEQUENCE)
+        sys.stdout.flush()
+    # For old Windows consoles
     else:
-        os.system("clear")
+        os.system("cls")
+
+
+# Correct usage of each command, shown when it gets the wrong arguments
+USAGE = {
+    "add": "add [name] [phone_number]",
+    "remove-contact": "remove-contact [name]",
+    "remove-phone": "remove-phone [name] [phone]",
+    "change": "change [name] [old_number] [new_number]",
+    "phone": "phone [name]",
+    "add-birthday": "add-birthday [name] [DD.MM.YYYY]",
+    "show-birthday": "show-birthday [name]",
+    "add-note": "add-note [name] [note_name] [note_content]",
+    "edit-note": "edit-note [name] [note_name] [new_note_content]",
+    "remove-note": "remove-note [name] [note_name]",
+    "show-notes": "show-notes [name]",
+    "add-email": "add-email [name] [email]",
+    "add-address": "add-address [name] [address]",
+    "add-tag": "add-tag [name] [note_name] [tag_name]",
+    "remove-tag": "remove-tag [name] [note_name] [tag_name]",
+    "find-notes-by-tag": "find-notes-by-tag [tag_name]",
+    "show-tags": "show-tags [name]",
+}
+
+
+def usage_message(command: str) -> str:
+    """
+    Build the message returned when a command gets the wrong arguments.
+
+    Args:
+        command (str): The command name.
+
+    Returns:
+        str: The message with the usage of the command.
+    """
+    return f"Incorrect input command argument. Use: '{USAGE[command]}'"
 
 
 @input_error
@@ -88,23 +179,22 @@ def add_contact(args: List[str], book: AddressBook) -> str:
     Returns:
         str: Success message indicating contact addition or update.
     """
-    try:
-        name, phone, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'add [name] [phone_number]'"
-        ) from e
+    if len(args) < 2:
+        return usage_message("add")
+    name, phone, *_ = args
     record = book.find(name)
     message = "Contact updated."
     if record is None:
         record = Record(name)
         book.add_record(record)
+        book.dirty = True
         message = "Contact added."
     if phone:
         if record.find_phone(phone):
             return "This phone number already exists."
         try:
             record.add_phone(phone)
+            book.dirty = True
         except PhoneNumberValueError:
             if message == "Contact updated.":
                 message = "The contact was not updated because you \
@@ -127,18 +217,16 @@ def remove_contact(args: List[str], book: AddressBook) -> str:
     Returns:
         str: Success message indicating contact deleted.
     """
-    try:
-        name, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'remove-contact [name]'"
-        ) from e
+    if len(args) < 1:
+        return usage_message("remove-contact")
+    name, *_ = args
     record = book.find(name)
     if not record:
         raise KeyError
-    answer = input("Are you sure you want to delete a contact ? y/n \n")
+    answer = ask("Are you sure you want to delete a contact ? y/n \n")
     if answer.lower() == "y":
         book.delete(name)
+        book.dirty = True
         return f"Contact {name} deleted"
     return f"Contact {name} not deleted"
 
@@ -153,16 +241,14 @@ def remove_phone(args: List[str], book: AddressBook) -> str:
     Returns:
         str: Success or error message.
     """
-    try:
-        name, phone, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'remove-phone [name] [phone]'"
-        ) from e
+    if len(args) < 2:
+        return usage_message("remove-phone")
+    name, phone, *_ = args
     record = book.find(name)
     if not record:
         raise KeyError
     record.remove_phone(phone)
+    book.dirty = True
     return "Phone number deleted"
 
 
@@ -178,18 +264,16 @@ def change_contact(args: List[str], book: AddressBook) -> str:
     Returns:
         str: Success or error message.
     """
-    try:
-        name, old_phone, new_phone, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'change [name] [old_number] [new_number]'"
-        ) from e
+    if len(args) < 3:
+        return usage_message("change")
+    name, old_phone, new_phone, *_ = args
     record = book.find(name)
     if not record:
         raise KeyError
     if record.find_phone(new_phone):
         return f"This phone number: {new_phone} already exists."
     record.edit_phone(old_phone, new_phone)
+    book.dirty = True
     return f"Contact {name} updated."
 
 
@@ -205,18 +289,19 @@ def show_phone(args: List[str], book: AddressBook) -> str:
     Returns:
         str: The phone number or an error message.
     """
-    try:
-        name, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'phone [name] [old_number] [new_number]'"
-        ) from e
+    if len(args) < 1:
+        return usage_message("phone")
+    name, *_ = args
     record = book.find(name)
     if not record:
         raise KeyError
     return str(record)
 
 
+# Larger books are printed as plain aligned columns, which is much faster
+TABULATE_MAX_ROWS = 100
+
+
 @input_error
 def show_all(_: List[str], book: AddressBook) -> str:
     """
@@ -228,22 +313,32 @@ def show_all(_: List[str], book: AddressBook) -> str:
     Returns:
         str: All contacts formatted as a string, or an error message if empty.
     """
-    if not book.data:
+    if not book:
         return "Sorry, your phone book is empty."
 
     header_list = ["Name", "Phones", "Birthday", "E-mail", "Address"]
 
-    record_list = []
-    for _, phone in book.data.items():
-        record = []
-        record.append(phone.name.value.capitalize())
-        record.append("; ".join(p.value for p in phone.phones))
-        record.append(phone.birthday if phone.birthday else "")
-        record.append(phone.email.value if phone.email else "")
-        record.append(phone.address.value if phone.address else "")
-        record_list.append(record)
-
-    print(tabulate(record_list, header_list, tablefmt="fancy_grid"))
+    record_list = [
+        [
+            record.name.display,
+            record.format_phones(),
+            record.birthday if record.birthday else "",
+            record.email.value if record.email else "",
+            record.address.value if record.address else "",
+        ]
+        for record in book.values()
+    ]
+
+    if len(record_list) <= TABULATE_MAX_ROWS:
+        # Imported on first use to keep it out of startup
+        from tabulate import tabulate
+
+        print(tabulate(record_list, header_list, tablefmt="fancy_grid"))
+    else:
+        rows = [header_list] + [[str(cell) for cell in row] for row in record_list]
+        widths = [max(len(cell) for cell in column) for column in zip(*rows)]
+        template = "  ".join(f"{{:<{width}}}" for width in widths)
+        print("\n".join(template.format(*row).rstrip() for row in rows))
     return "End of contacts list"
 
 
@@ -259,16 +354,14 @@ def add_birthday(args: List[str], book: AddressBook) -> str:
         Returns:
             str: Success message indicating birthday addition.
     """
-    try:
-        name, birthday, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'add_birthday [name] [DD.MM.YYYY]'"
-        ) from e
+    if len(args) < 2:
+        return usage_message("add-birthday")
+    name, birthday, *_ = args
     record = book.find(name)
     if not record:
         raise KeyError
     record.add_birthday(birthday)
+    book.dirty = True
     return "Contact birthday added"
 
 
@@ -284,18 +377,21 @@ def show_birthday(args: List[str], book: AddressBook) -> str:
     Returns:
         str: The birthday or an error message.
     """
-    try:
-        name, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'show_birthday [name]'"
-        ) from e
+    if len(args) < 1:
+        return usage_message("show-birthday")
+    name, *_ = args
     record = book.find(name)
     if not record or not record.birthday:
         raise KeyError
     return str(record.birthday)
 
 
+# Formats one entry returned by AddressBook.get_upcoming_birthdays
+BIRTHDAY_LINE = (
+    "Name : {name:<10} - congratulation_date: {congratulation_date}".format_map
+)
+
+
 @input_error
 def birthdays(args: list[str], book: AddressBook) -> str:
     """
@@ -312,32 +408,57 @@ def birthdays(args: list[str], book: AddressBook) -> str:
         upcoming_birthdays = book.get_upcoming_birthdays(days)
     else:
         upcoming_birthdays = book.get_upcoming_birthdays()
-    upcoming = ""
     if upcoming_birthdays:
-        for birthday in upcoming_birthdays:
-            upcoming += f"Name : {birthday['name']:<10} - congratulation_date: \
-            {birthday['congratulation_date']}\n"
-        return upcoming.strip()
+        return "\n".join(map(BIRTHDAY_LINE, upcoming_birthdays))
     return "No upcoming birthdays"
 
 
+# First byte of files written by pickle protocol 2 and above
+PICKLE_MAGIC = b"\x80"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
 def save_data(book: AddressBook, filename: str = "addressbook.pkl") -> None:
     """
-    Save the address book to a file.
+    Save the address book to a file as gzip-compressed msgpack.
+
+    The data is written to a temporary file in one call and then moved over
+    the target, so an interrupted save never leaves a truncated file behind.
     """
-    with open(filename, "wb") as f:
-        pickle.dump(book, f)
+    packed = msgpack.packb(book.to_dict(), use_bin_type=True)
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, "wb") as f:
+        f.write(gzip.compress(packed, compresslevel=3))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_filename, filename)
+    book.dirty = False
 
 
-def load_data(filename: str = "addressbook.pkl"):
+def load_data(filename: str = "addressbook.pkl") -> AddressBook:
     """
     Load the address book from a file.
+
+    Uncompressed files and files saved by older versions with pickle are
+    converted on load and are written back compressed on the next save.
     """
     try:
         with open(filename, "rb") as f:
-            return pickle.load(f)
+            raw = f.read()
     except FileNotFoundError:
         return AddressBook()
+    if raw[:2] != GZIP_MAGIC:
+        if raw[:1] == PICKLE_MAGIC:
+            # Only needed once to convert files from older versions
+            import pickle
+
+            book = AddressBook.from_dict(pickle.loads(raw).to_dict())
+        else:
+            book = AddressBook.from_dict(msgpack.unpackb(raw, raw=False))
+        # Write the file back in the current format on the next save
+        book.dirty = True
+        return book
+    return AddressBook.from_dict(msgpack.unpackb(gzip.decompress(raw), raw=False))
 
 
 @input_error
@@ -353,26 +474,18 @@ def add_note_to_contact(args: List[str], book: AddressBook) -> str:
         str: Success message indicating note addition.
     """
     if len(args) < 3:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'add-note [name] [note_name] [note_content]'"
-        )
+        return usage_message("add-note")
 
-    try:
-        contact_name = args[0]
-        note_name = args[1]
-        note_content = " ".join(
-            args[2:]
-        )  # Join the rest of the arguments as the note content
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'add-note [name] [note_name] [note_content]'"
-        ) from e
+    contact_name = args[0]
+    note_name = args[1]
+    note_content = args[2]
 
     record = book.find(contact_name)
     if not record:
         raise KeyError(f"Contact with name '{contact_name}' not found.")
 
     record.add_note(note_content, note_name)
+    book.dirty = True
     return "Note added."
 
 
@@ -389,26 +502,18 @@ def edit_note_in_contact(args: List[str], book: AddressBook) -> str:
         str: Success message indicating note update.
     """
     if len(args) < 3:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'edit-note [name][note_name][new_note_content]'"
-        )
+        return usage_message("edit-note")
 
-    try:
-        contact_name = args[0]
-        note_name = args[1]
-        new_note_content = " ".join(
-            args[2:]
-        )  # Join the rest of the arguments as the note content
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'edit-note [name][note_name][new_note_content]'"
-        ) from e
+    contact_name = args[0]
+    note_name = args[1]
+    new_note_content = args[2]
 
     record = book.find(contact_name)
     if not record:
         raise KeyError(f"Contact with name '{contact_name}' not found.")
 
     record.edit_note(note_name, new_note_content)
+    book.dirty = True
     return "Note updated."
 
 
@@ -425,23 +530,17 @@ def remove_note_from_contact(args: List[str], book: AddressBook) -> str:
         str: Success message indicating note removal.
     """
     if len(args) < 2:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'remove-note [name] [note_name]'"
-        )
+        return usage_message("remove-note")
 
-    try:
-        contact_name = args[0]
-        note_name = args[1]
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'remove-note [name] [note_name]'"
-        ) from e
+    contact_name = args[0]
+    note_name = args[1]
 
     record = book.find(contact_name)
     if not record:
         raise KeyError(f"Contact with name '{contact_name}' not found.")
 
     record.remove_note_by_name(note_name)
+    book.dirty = True
     return "Note removed."
 
 
@@ -457,12 +556,9 @@ def show_notes_for_contact(args: List[str], book: AddressBook) -> str:
     Returns:
         str: All notes for the contact or an error message.
     """
-    try:
-        name, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'show-notes [name]'"
-        ) from e
+    if len(args) < 1:
+        return usage_message("show-notes")
+    name, *_ = args
 
     record = book.find(name)
     if not record or not record.notes:
@@ -484,32 +580,17 @@ def find_notes_by_keyword(args: List[str], book: AddressBook) -> str:
         str: List of notes containing the keyword or a message indicating none.
     """
     if not args:
-        raise ValueError(
-            "No keyword provided. Please provide a keyword to search. Use: 'find-notes [keyword]'"
-        )
+        return "No keyword provided. Please provide a keyword to search. Use: 'find-notes [keyword]'"
 
-    try:
-        keyword = args[0]
-    except ValueError as e:
-        raise ValueError(
-            "No keyword provided. Please provide a keyword to search. Use: 'find-notes [keyword]'"
-        ) from e
+    keyword = args[0]
 
-    notes_found = []
-
-    # Iterate through all records in the address book
-    for record in book.data.values():
-        # Find notes in each record that contain the keyword
-        notes = record.find_note_by_keyword(keyword)
-        if notes:
-            for note in notes:
-                notes_found.append((record.name.value, note.name, note.value))
+    notes_found = book.find_notes_by_keyword(keyword)
 
     # Format the output
     if notes_found:
         return "\n".join(
-            f"Contact: {contact_name}, Note Name: {note_name}, Note: {note_value}"
-            for contact_name, note_name, note_value in notes_found
+            f"Contact: {record.name.value}, Note Name: {note.name}, Note: {note.value}"
+            for record, note in notes_found
         )
     return "No notes found containing the keyword."
 
@@ -519,16 +600,14 @@ def add_email(args, book: AddressBook):
     """
     Add a email to an existing contact.
     """
-    try:
-        name, email = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'add-email [name] [email]'"
-        ) from e
+    if len(args) != 2:
+        return usage_message("add-email")
+    name, email = args
     record = book.find(name)
     if not record:
         raise KeyError
     record.add_email(email)
+    book.dirty = True
     return "Email added."
 
 
@@ -537,16 +616,14 @@ def add_address(args, book: AddressBook):
     """
     Add a address to an existing contact.
     """
-    try:
-        name, *address = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'add-address [name] [address]'"
-        ) from e
+    if len(args) < 1:
+        return usage_message("add-address")
+    name, *address = args
     record = book.find(name)
     if not record:
         raise KeyError
     record.add_address(address)
+    book.dirty = True
     return "Address added."
 
 
@@ -556,28 +633,21 @@ def add_tag_to_contact(args: List[str], book: AddressBook):
     Add a tag to a note within an existing contact.
     """
     if len(args) < 3:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'add-tag [name] [note_name] [tag_name]'"
-        )
+        return usage_message("add-tag")
+    contact_name, note_name, tag_name, *_ = args
 
-    try:
-        contact_name, note_name, tag_name, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'add-tag [name] [note_name] [tag_name]'"
-        ) from e
-
-    contact = book.data.get(contact_name)
+    contact = book.get(contact_name)
     if not contact:
         raise KeyError(f"Contact with name '{contact_name}' not found.")
 
-    note = next((note for note in contact.notes if note.name == note_name), None)
+    note = contact.find_note(note_name)
     if not note:
         raise KeyError(
             f"Note with name '{note_name}' not found in contact '{contact_name}'."
         )
 
     note.add_tag(tag_name)
+    book.dirty = True
     return "Tag added successfully."
 
 
@@ -587,22 +657,14 @@ def remove_tag_from_contact(args: List[str], book: AddressBook):
     Remove a tag from a note within an existing contact.
     """
     if len(args) < 3:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'remove-tag [name] [note_name] [tag_name]'"
-        )
+        return usage_message("remove-tag")
+    contact_name, note_name, tag_name, *_ = args
 
-    try:
-        contact_name, note_name, tag_name, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'remove-tag [name] [note_name] [tag_name]'"
-        ) from e
-
-    contact = book.data.get(contact_name)
+    contact = book.get(contact_name)
     if not contact:
         return f"Contact with name '{contact_name}' not found."
 
-    note = next((note for note in contact.notes if note.name == note_name), None)
+    note = contact.find_note(note_name)
     if not note:
         record = book.find(contact_name)
         if not record:
@@ -613,6 +675,7 @@ def remove_tag_from_contact(args: List[str], book: AddressBook):
 
     try:
         note.remove_tag(tag_name)
+        book.dirty = True
         return "Tag removed successfully."
     except ValueError as e:
         return str(e)
@@ -624,16 +687,8 @@ def find_notes_by_tag(args: List[str], book: AddressBook):
     Find notes containing a specific tag.
     """
     if len(args) < 1:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'find-notes-by-tag [tag_name]'"
-        )
-
-    try:
-        tag, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'find-notes-by-tag [tag_name]'"
-        ) from e
+        return usage_message("find-notes-by-tag")
+    tag, *_ = args
 
     notes = book.find_notes_by_tag(tag)
     if notes:
@@ -654,25 +709,15 @@ def show_tags_for_contact(args: List[str], book: AddressBook) -> str:
         str: A list of tags or a message indicating none.
     """
     if len(args) < 1:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'show-all-tags [name]'"
-        )
+        return usage_message("show-tags")
+    contact_name, *_ = args
 
-    try:
-        contact_name, *_ = args
-    except ValueError as e:
-        raise ValueError(
-            "Incorrect input command argument. Use: 'show-all-tags [name]'"
-        ) from e
-
-    contact = book.data.get(contact_name)
+    contact = book.get(contact_name)
 
     if not contact:
         raise KeyError(f"Contact with name '{contact_name}' not found.")
 
-    tags = []
-    for note in contact.notes:
-        tags.extend(note.tags)
+    tags = list(chain.from_iterable(note.sorted_tags() for note in contact.notes))
 
     if tags:
         return f"Tags for {contact_name}: {', '.join(tags)}"
@@ -691,11 +736,11 @@ def show_all_sorted_tags(_: List[str], book: AddressBook) -> str:
     Returns:
         str: A list of all unique tags sorted alphabetically.
     """
-    tags = set()
-
-    for contact in book.data.values():
-        for note in contact.notes:
-            tags.update(note.tags)
+    tags = set(
+        chain.from_iterable(
+            note.tags for contact in book.values() for note in contact.notes
+        )
+    )
 
     sorted_tags = sorted(tags)
 
@@ -716,21 +761,21 @@ def show_all_notes_sorted_by_tags(_: List[str], book: AddressBook) -> str:
     Returns:
         str: A list of notes sorted by tags or a message indicating none.
     """
-    all_notes = []
-
-    # Collect all notes and tags
-    for record in book.data.values():
-        for note in record.notes:
-            all_notes.append((note, record.name.value))
+    # Collect all notes with their sort key (tags, then text) computed once
+    sorted_notes = [
+        ((tuple(note.sorted_tags()), note.value), note, record.name.value)
+        for record in book.values()
+        for note in record.notes
+    ]
 
     # Sort notes by tags
-    sorted_notes = sorted(all_notes, key=lambda x: (x[0].tags, x[0].value))
+    sorted_notes.sort(key=itemgetter(0))
 
     # Formation of the result
     if sorted_notes:
         result = []
-        for note, contact_name in sorted_notes:
-            tags_str = f"[Tags: {', '.join(note.tags)}]" if note.tags else ""
+        for _, note, contact_name in sorted_notes:
+            tags_str = f"[Tags: {', '.join(note.sorted_tags())}]" if note.tags else ""
             result.append(f"Contact: {contact_name}, Note: '{note.value}' {tags_str}")
         return "\n".join(result)
 
@@ -3,10 +3,38 @@ Project team 04
 """
 
 import os
+import threading
 from prompt_toolkit import PromptSession
+from src import book_controller
 from src.assistant_controller import execute_command, CommandCompleter
 from src.book_controller import parse_input, save_data, load_data, clear_screen
 
+EXIT_COMMANDS = frozenset(("close", "exit"))
+CLEAR_COMMANDS = frozenset(("cls", "clear"))
+# Seconds between background saves of unsaved changes
+AUTOSAVE_INTERVAL = 5
+
+
+def autosave(book, path, lock, stop):
+    """
+    Save the address book in the background while it has unsaved changes.
+    A failed save leaves the book marked as changed, so it is tried again on
+    the next interval.
+
+    Args:
+        book (AddressBook): The address book to save.
+        path (str): The file to save to.
+        lock (threading.Lock): Lock held while the book is used or saved.
+        stop (threading.Event): Event that ends the loop when set.
+    """
+    while not stop.wait(AUTOSAVE_INTERVAL):
+        with lock:
+            if book.dirty:
+                try:
+                    save_data(book, path)
+                except OSError:
+                    pass
+
 
 def main():
     """
@@ -14,11 +42,20 @@ def main():
     """
     home_dir = os.path.expanduser("~")
     path = os.path.join(home_dir, "Documents", "addressbook.pkl")
+    print("Welcome to the assistant bot!")
+    book = load_data(path)
+
     # Set up a Completer for dynamic suggestions
     command_completer = CommandCompleter()
     session = PromptSession(completer=command_completer)
-    book = load_data(path)
-    print("Welcome to the assistant bot!")
+    # Confirmations get their own session, without command completion and
+    # without adding the answers to the command history
+    book_controller.ask = PromptSession().prompt
+    lock = threading.Lock()
+    stop = threading.Event()
+    threading.Thread(
+        target=autosave, args=(book, path, lock, stop), daemon=True
+    ).start()
     while True:
         try:
             user_input = session.prompt("Enter a command: ")
@@ -26,17 +63,22 @@ def main():
         except (KeyboardInterrupt, ValueError):
             continue  # Control-C pressed. Try again.
         except EOFError:
-            save_data(book, path)
             break  # Control-D pressed. Exit the loop.
-        if command in ["close", "exit"]:
+        if not command:
+            continue
+        if command in EXIT_COMMANDS:
             print("Good bye!")
-            save_data(book, path)
             break
-        if command in ["cls", "clear"]:
+        if command in CLEAR_COMMANDS:
             clear_screen()
             continue
-        result = execute_command(command, args, book)
+        with lock:
+            result = execute_command(command, args, book)
         print(result)
+    stop.set()
+    with lock:
+        if book.dirty:
+            save_data(book, path)
 
 
 if __name__ == "__main__":
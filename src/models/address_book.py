@@ -2,16 +2,45 @@
 AddressBook
 """
 
-from datetime import datetime, timedelta
-from collections import UserDict
+from datetime import date, timedelta
+from src.models.fields import Note, format_date
 from src.models.record import Record
 
 
-class AddressBook(UserDict):
+class AddressBook(dict):
     """
-    Class for storing and managing contact records. Inherits from UserDict.
+    Class for storing and managing contact records. Inherits from dict.
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Lazily built note search index, see find_notes_by_keyword. Dropped
+        # by add_record and delete, and rebuilt when Record.notes_version
+        # changed since it was built
+        self._note_index = None
+        self._note_index_version = None
+        # Lazily built birthday index, see get_upcoming_birthdays, kept
+        # up to date the same way with Record.birthdays_version
+        self._birthday_index = None
+        self._birthday_index_version = None
+        # True while the book has changes that are not saved to disk, set by
+        # the command handlers after a change succeeds
+        self.dirty = False
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restores the address book from pickled attributes. Books pickled
+        while AddressBook was a UserDict keep their records under "data".
+
+        Args:
+            state (dict): The pickled attributes.
+        """
+        self.update(state.pop("data", ()))
+        self._note_index = self._birthday_index = None
+        self._note_index_version = self._birthday_index_version = None
+        self.dirty = False
+        self.__dict__.update(state)
+
     def add_record(self, record: Record) -> None:
         """
         Adds a record to the address book.
@@ -19,7 +48,8 @@ class AddressBook(UserDict):
         Args:
             record (Record): The record to add.
         """
-        self.data[record.name.value] = record
+        self[record.name.value] = record
+        self._note_index = self._birthday_index = None
 
     def find(self, name: str) -> Record:
         """
@@ -31,7 +61,7 @@ class AddressBook(UserDict):
         Returns:
             Record: The record if found, or None.
         """
-        return self.data.get(name)
+        return self.get(name)
 
     def delete(self, name: str) -> None:
         """
@@ -40,51 +70,154 @@ class AddressBook(UserDict):
         Args:
             name (str): The name of the record to delete.
         """
-        if name in self.data:
-            del self.data[name]
+        if self.pop(name, None) is not None:
+            self._note_index = self._birthday_index = None
+
+    def to_dict(self) -> list[dict]:
+        """
+        Converts the address book into a list of plain record dictionaries.
+
+        Returns:
+            list[dict]: The records data.
+        """
+        return [record.to_dict() for record in self.values()]
 
-    def get_upcoming_birthdays(self, days_quantity: int = 7) -> list[dict[str, str]]:
+    @classmethod
+    def from_dict(cls, records: list[dict]) -> "AddressBook":
+        """
+        Creates an address book from data produced by `to_dict`.
+
+        Args:
+            records (list[dict]): The records data.
+
+        Returns:
+            AddressBook: The restored address book.
+        """
+        book = cls()
+        for data in records:
+            book.add_record(Record.from_dict(data))
+        return book
+
+    def get_upcoming_birthdays(
+        self, days_quantity: int = 7, today: date | None = None
+    ) -> list[dict[str, str]]:
         """
         Returns a list of users with upcoming birthdays, including the congratulation date.
 
+        Only the (month, day) keys of the days in the window are looked up in
+        the birthday index, so the cost does not grow with the book size.
+
+        Args:
+            days_quantity (int): The number of days ahead to look at.
+            today (date, optional): The first day of the window, today's
+                date by default. Lets callers reuse one date across calls.
+
         Returns:
             list[dict[str, str]]: List of users with upcoming birthdays.
         """
         users_upcoming_birthday = []
-        today = datetime.today().date()
-        for user_name, user in self.data.items():
+        if today is None:
+            today = date.today()
+        index = self._birthday_index
+        if index is None or self._birthday_index_version != Record.birthdays_version:
+            index = self._build_birthday_index()
+        seen = set()
+        # A window longer than a year would repeat the same (month, day) keys
+        for offset in range(min(days_quantity, 365) + 1):
+            birthday_this_year = today + timedelta(days=offset)
+            key = (birthday_this_year.month, birthday_this_year.day)
+            if key in seen:
+                continue
+            seen.add(key)
+            names = index.get(key)
+            if not names:
+                continue
+            # Move birthdays on Saturday or Sunday to the next Monday
+            weekday = birthday_this_year.weekday()
+            if weekday >= 5:
+                birthday_this_year += timedelta(days=7 - weekday)
+            congratulation_date = format_date(birthday_this_year)
+            users_upcoming_birthday.extend(
+                {"name": user_name, "congratulation_date": congratulation_date}
+                for user_name in names
+            )
+        return users_upcoming_birthday
+
+    def _build_birthday_index(self) -> dict[tuple[int, int], list[str]]:
+        """
+        Builds the birthday index.
+
+        Returns:
+            dict[tuple[int, int], list[str]]: The names of the contacts in
+                book order for each (month, day) of their birthdays.
+        """
+        self._birthday_index_version = Record.birthdays_version
+        index = {}
+        for user_name, user in self.items():
             if user.birthday:
                 birthday_date = user.birthday.value
-
-                # Set the birthday to the current year
-                birthday_this_year = birthday_date.replace(year=today.year)
-
-                # If the birthday this year has already passed, set it to next year
-                if birthday_this_year < today:
-                    birthday_this_year = birthday_this_year.replace(year=today.year + 1)
-
-                # Check if the birthday is within the next x days
-                if 0 <= (birthday_this_year - today).days <= days_quantity:
-                    # Adjust the birthday to avoid weekends
-                    while birthday_this_year.weekday() in [5, 6]:
-                        birthday_this_year += timedelta(days=1)
-                    users_upcoming_birthday.append(
-                        {
-                            "name": user_name,
-                            "congratulation_date": birthday_this_year.strftime(
-                                "%d.%m.%Y"
-                            ),
-                        }
-                    )
-        return users_upcoming_birthday
+                key = (birthday_date.month, birthday_date.day)
+                index.setdefault(key, []).append(user_name)
+        self._birthday_index = index
+        return index
 
     def find_notes_by_tag(self, tag: str) -> list:
         """
         Find all notes that contain the given tag.
         """
         notes_with_tag = []
-        for record in self.data.values():
+        for record in self.values():
             for note in record.notes:
                 if tag in note.tags:
                     notes_with_tag.append(note)
         return notes_with_tag
+
+    def _build_note_index(self) -> tuple[list, dict[str, list[int]]]:
+        """
+        Builds the note search index.
+
+        Returns:
+            tuple: A list of (record, note) pairs in book order and a dict
+                mapping each casefolded word of the notes to positions in
+                that list.
+        """
+        self._note_index_version = Record.notes_version
+        entries = []
+        words = {}
+        for record in self.values():
+            for note in record.notes:
+                position = len(entries)
+                entries.append((record, note))
+                for word in set(note.casefolded.split()):
+                    words.setdefault(word, []).append(position)
+        self._note_index = entries, words
+        return self._note_index
+
+    def find_notes_by_keyword(self, keyword: str) -> list[tuple[Record, Note]]:
+        """
+        Finds notes containing a keyword across all records, ignoring case.
+
+        A keyword without whitespace can only occur inside a single word of
+        a note, so only the distinct words of the index are searched.
+
+        Args:
+            keyword (str): The keyword to search for in the notes.
+
+        Returns:
+            list[tuple[Record, Note]]: The matching notes with their records.
+        """
+        keyword = keyword.casefold()
+        if not keyword or keyword.split() != [keyword]:
+            return [
+                (record, note)
+                for record in self.values()
+                for note in record.find_note_by_keyword(keyword)
+            ]
+        if self._note_index is None or self._note_index_version != Record.notes_version:
+            self._build_note_index()
+        entries, words = self._note_index
+        positions = set()
+        for word, word_positions in words.items():
+            if keyword in word:
+                positions.update(word_positions)
+        return [entries[position] for position in sorted(positions)]
@@ -2,8 +2,41 @@
 Fields record in address book.
 """
 
-import re
-from datetime import datetime
+import sys
+from datetime import date
+from string import ascii_lowercase, digits
+
+# Characters allowed in the local part of an email besides one "." or "_"
+_EMAIL_LOCAL_CHARS = frozenset(ascii_lowercase + digits)
+
+
+def format_date(value: date) -> str:
+    """
+    Formats a date for display.
+
+    Args:
+        value (date): The date to format.
+
+    Returns:
+        str: The date in the format "DD.MM.YYYY".
+    """
+    return f"{value.day:02d}.{value.month:02d}.{value.year:04d}"
+
+
+def set_pickled_state(instance: object, state: dict | tuple) -> None:
+    """
+    Sets pickled attributes on an instance. Accepts the attributes dict of
+    instances pickled before their class defined __slots__ as well as the
+    (None, {slot: value}) state pickled for slotted instances.
+
+    Args:
+        instance (object): The instance being unpickled.
+        state (dict | tuple): The pickled state.
+    """
+    if isinstance(state, tuple):
+        state = state[1]
+    for key, value in state.items():
+        setattr(instance, key, value)
 
 
 class NameValueError(Exception):
@@ -50,6 +83,8 @@ class Field:
         value (str): The value of the field.
     """
 
+    __slots__ = ("value",)
+
     def __init__(self, value: str):
         """
         Initializes the field.
@@ -68,16 +103,61 @@ class Field:
         """
         return str(self.value)
 
+    def __setstate__(self, state: dict | tuple) -> None:
+        """
+        Restores the field from pickled attributes, including fields pickled
+        before the class defined __slots__.
+
+        Args:
+            state (dict | tuple): The pickled state.
+        """
+        set_pickled_state(self, state)
+
+    @classmethod
+    def restore(cls, value, **attributes) -> "Field":
+        """
+        Creates a field from stored data without validating it, so data saved
+        under older input rules still loads.
+
+        Args:
+            value: The stored value of the field.
+            **attributes: The other stored attributes of the field.
+
+        Returns:
+            Field: The restored field.
+        """
+        field = cls.__new__(cls)
+        field.__setstate__({"value": value, **attributes})
+        return field
+
 
 class Name(Field):
     """
     Class for storing a contact's name. Inherits from Field.
+
+    Attributes:
+        display (str): The capitalized name used in listings.
     """
 
+    __slots__ = ("display",)
+
     def __init__(self, name: str) -> None:
         if len(name) < 2:
             raise NameValueError("The name must be more than two characters long")
-        super().__init__(name)
+        # Interned, as the name is also the record's key in the address book
+        super().__init__(sys.intern(name))
+        self.display = self.value.capitalize()
+
+    def __setstate__(self, state: dict | tuple) -> None:
+        """
+        Restores the name from pickled attributes and sets its display form.
+
+        Args:
+            state (dict | tuple): The pickled state.
+        """
+        super().__setstate__(state)
+        self.value = sys.intern(self.value)
+        self.display = self.value.capitalize()
 
 
 class Phone(Field):
@@ -86,6 +166,8 @@ class Phone(Field):
     Validates the phone number format (10 digits).
     """
 
+    __slots__ = ()
+
     def __init__(self, value: str):
         """
         Initializes the phone number with validation.
@@ -96,7 +178,7 @@ class Phone(Field):
         Raises:
             ValueError: If the phone number does not match the format (10 digits).
         """
-        if not re.fullmatch(r"0\d{9}", value):
+        if len(value) != 10 or value[0] != "0" or not value.isdecimal():
             raise PhoneNumberValueError(
                 "Phone number must be 10 digits in format: 0XXXXXXXXX"
             )
@@ -106,8 +188,13 @@ class Phone(Field):
 class Birthday(Field):
     """
     Class for storing and validating a birthday. Inherits from Field.
+
+    Attributes:
+        _str (str): The birthday formatted once for display.
     """
 
+    __slots__ = ("_str",)
+
     def __init__(self, value: str):
         """
         Initializes the birthday with validation.
@@ -118,30 +205,39 @@ class Birthday(Field):
         Raises:
             ValueError: If the birthday does not match the required format.
         """
-        if not re.fullmatch(r"[0123]\d\.[01]\d\.[12][09]\d{2}", value):
+        if (
+            len(value) != 10
+            or value[2] != "."
+            or value[5] != "."
+            or value[6:8] not in ("10", "19", "20", "29")
+            or not (value[:2] + value[3:5] + value[6:]).isdecimal()
+        ):
             raise BirthdayValueError("Date must be in format: DD.MM.YYYY and age < 120")
         try:
             birthday = self.convert_str_to_date(value)
-            super().__init__(birthday)
-        except ValueError as exc:
-            raise BirthdayValueError("Invalid date format. Use DD.MM.YYYY") from exc
-        if birthday <= datetime.now().date():
+        except ValueError:
+            raise BirthdayValueError("Invalid date format. Use DD.MM.YYYY") from None
+        if birthday <= date.today():
             super().__init__(birthday)
         else:
             raise BirthdayValueError("The date cannot be in the future ")
+        self._str = format_date(birthday)
 
     @staticmethod
-    def convert_str_to_date(date: str) -> datetime.date:
+    def convert_str_to_date(date_: str) -> date:
         """
         Convert date string to date object.
 
         Args:
-            date (str): The date string in the format "DD.MM.YYYY".
+            date_ (str): The date string in the format "DD.MM.YYYY".
 
         Returns:
-            datetime.date: The corresponding date object.
+            date: The corresponding date object.
+
+        Raises:
+            ValueError: If the day, month or year is out of range.
         """
-        return datetime.strptime(date, "%d.%m.%Y").date()
+        return date(int(date_[6:10]), int(date_[3:5]), int(date_[0:2]))
 
     def __str__(self) -> str:
         """
@@ -150,33 +246,69 @@ class Birthday(Field):
         Returns:
             str: The birthday in the format "DD.MM.YYYY".
         """
-        return self.value.strftime("%d.%m.%Y")
+        return self._str
+
+    def __setstate__(self, state: dict | tuple) -> None:
+        """
+        Restores the birthday from pickled attributes and formats it again.
+
+        Args:
+            state (dict | tuple): The pickled state.
+        """
+        super().__setstate__(state)
+        self._str = format_date(self.value)
 
 
 class Note(Field):
     """
     Class for storing a note associated with a contact, including a name.
+
+    Attributes:
+        casefolded (str): The note content casefolded once for
+            case-insensitive search.
     """
 
+    __slots__ = ("name", "tags", "casefolded")
+
     def __init__(self, value: str, name: str = None):
         if len(value) < 1:
             raise NoteValueError("Note cannot be empty")
         self.name = name
         self.value = value
-        self.tags = []
+        self.tags = set()
+        self.casefolded = value.casefold()
         super().__init__(value)
 
     def add_tag(self, tag: str) -> None:
         """Adds a tag to the note."""
-        if tag not in self.tags:
-            self.tags.append(tag)
+        self.tags.add(tag)
 
     def remove_tag(self, tag: str) -> None:
         """Removes a tag from the note."""
-        if tag in self.tags:
-            self.tags.remove(tag)
-        else:
+        if tag not in self.tags:
             raise ValueError(f"Tag '{tag}' not found in note.")
+        self.tags.remove(tag)
+
+    def __setstate__(self, state: dict | tuple) -> None:
+        """
+        Restores the note from pickled attributes, with its tags as a set and
+        its content casefolded for search.
+
+        Args:
+            state (dict | tuple): The pickled state.
+        """
+        super().__setstate__(state)
+        self.tags = set(self.tags)
+        self.casefolded = self.value.casefold()
+
+    def sorted_tags(self) -> list[str]:
+        """
+        Returns the tags of the note in alphabetical order.
+
+        Returns:
+            list[str]: The sorted tags.
+        """
+        return sorted(self.tags)
 
     def __str__(self) -> str:
         """
@@ -186,7 +318,7 @@ class Note(Field):
             str: The note content, and if available, the name.
         """
 
-        tags_str = f" [Tags: {', '.join(self.tags)}]" if self.tags else ""
+        tags_str = f" [Tags: {', '.join(self.sorted_tags())}]" if self.tags else ""
         return f"Note: '{self.value}'{tags_str}"
 
 
@@ -196,6 +328,8 @@ class Email(Field):
     Validates the email format (xxxxx@xx.xx).
     """
 
+    __slots__ = ()
+
     def __init__(self, value: str):
         """
         Initializes the Email with validation.
@@ -206,10 +340,38 @@ class Email(Field):
         Raises:
             ValueError: If the Email does not match the format (xxxxx@xx.xx).
         """
-        if not re.fullmatch(r"^[a-z0-9]+[\._]?[a-z0-9]+[@]\w+[.]\w+$", value):
+        local, at, domain = value.partition("@")
+        host, dot, zone = domain.partition(".")
+        if (
+            not at
+            or len(local) < 2
+            or local[0] in "._"
+            or local[-1] in "._"
+            or local.count(".") + local.count("_") > 1
+            or not _EMAIL_LOCAL_CHARS.issuperset(
+                local.replace(".", "").replace("_", "")
+            )
+            or not dot
+            or not self._is_word(host)
+            or not self._is_word(zone)
+        ):
             raise EmailValueError("Invalid Email. Use xxxxx@xx.xx")
         super().__init__(value)
 
+    @staticmethod
+    def _is_word(part: str) -> bool:
+        """
+        Checks that a part of the domain is made of letters, digits and "_".
+
+        Args:
+            part (str): The part of the domain.
+
+        Returns:
+            bool: True if the part is not empty and has no other characters.
+        """
+        # "_" is swapped for a letter, as isalnum() rejects it
+        return part.replace("_", "a").isalnum()
+
 
 class Address(Field):
     """
@@ -217,6 +379,8 @@ class Address(Field):
     Validates that field is not empty.
     """
 
+    __slots__ = ()
+
     def __init__(self, address: str):
         """
         Initializes the Address with validation.
@@ -2,7 +2,6 @@
 class Record
 """
 
-import re
 from src.models.fields import (
     Name,
     Birthday,
@@ -12,6 +11,7 @@ from src.models.fields import (
     Address,
     PhoneNumberValueError,
     NoteValueError,
+    set_pickled_state,
 )
 
 
@@ -25,6 +25,24 @@ class Record:
         birthday (Birthday): The contact's birthday.
     """
 
+    __slots__ = (
+        "name",
+        "phones",
+        "birthday",
+        "notes",
+        "email",
+        "address",
+        "_cached_str",
+        "_phones_str",
+        "_phone_index",
+        "_notes_by_name",
+    )
+
+    # Incremented whenever a birthday or a note of any record changes, so
+    # the indexes AddressBook builds from them can tell they are stale
+    birthdays_version = 0
+    notes_version = 0
+
     def __init__(self, name: str):
         """
         Initializes the record with the contact's name.
@@ -38,6 +56,14 @@ class Record:
         self.notes = []
         self.email = None
         self.address = None
+        # Formatted __str__ output, reset by every method that changes it
+        self._cached_str = None
+        # Joined phone numbers, reset together with _cached_str by phone methods
+        self._phones_str = None
+        # First phone for each number, kept in sync by the phone methods
+        self._phone_index = {}
+        # First note for each note name, kept in sync by the note methods
+        self._notes_by_name = {}
 
     def add_birthday(self, birthday: str) -> None:
         """
@@ -47,6 +73,8 @@ class Record:
             birthday (str): The birthday to add.
         """
         self.birthday = Birthday(birthday)
+        self._cached_str = None
+        Record.birthdays_version += 1
 
     def add_phone(self, phone_number: str) -> None:
         """
@@ -55,7 +83,10 @@ class Record:
         Args:
             phone_number (str): The phone number to add.
         """
-        self.phones.append(Phone(phone_number))
+        new_phone = Phone(phone_number)
+        self.phones.append(new_phone)
+        self._phone_index.setdefault(new_phone.value, new_phone)
+        self._cached_str = self._phones_str = None
 
     def remove_phone(self, phone_number: str) -> None:
         """
@@ -67,6 +98,8 @@ class Record:
         phone_to_remove = self.find_phone(phone_number)
         if phone_to_remove:
             self.phones.remove(phone_to_remove)
+            self._reindex_phone(phone_number)
+            self._cached_str = self._phones_str = None
         else:
             raise PhoneNumberValueError("Phone number not found")
 
@@ -80,9 +113,10 @@ class Record:
         """
         phone_to_edit = self.find_phone(old_number)
         if phone_to_edit:
-            if not re.fullmatch(r"\d{10}", new_number):
-                raise PhoneNumberValueError("Phone number must be 10 digits")
-            phone_to_edit.value = new_number
+            phone_to_edit.value = Phone(new_number).value
+            self._reindex_phone(old_number)
+            self._reindex_phone(new_number)
+            self._cached_str = self._phones_str = None
         else:
             raise PhoneNumberValueError("Phone number not found")
 
@@ -96,10 +130,32 @@ class Record:
         Returns:
             Phone: The phone number if found, or None.
         """
-        for phone in self.phones:
-            if phone.value == phone_number:
-                return phone
-        return None
+        return self._phone_index.get(phone_number)
+
+    def _reindex_phone(self, phone_number: str) -> None:
+        """
+        Points the phone index at the first phone with the given number
+        after the phones list changed.
+
+        Args:
+            phone_number (str): The phone number to re-index.
+        """
+        phone = next((p for p in self.phones if p.value == phone_number), None)
+        if phone is None:
+            self._phone_index.pop(phone_number, None)
+        else:
+            self._phone_index[phone_number] = phone
+
+    def format_phones(self) -> str:
+        """
+        Returns the phone numbers joined for display.
+
+        Returns:
+            str: The phone numbers separated by "; ".
+        """
+        if self._phones_str is None:
+            self._phones_str = "; ".join([p.value for p in self.phones])
+        return self._phones_str
 
     def add_note(self, note: str, name: str = None) -> None:
         """
@@ -109,7 +165,10 @@ class Record:
             note (str): The content of the note to add.
             name (str, optional): The name associated with the note.
         """
-        self.notes.append(Note(note, name))
+        new_note = Note(note, name)
+        self.notes.append(new_note)
+        self._notes_by_name.setdefault(name, new_note)
+        Record.notes_version += 1
 
     def edit_note(self, old_name: str, new_note: str) -> None:
         """
@@ -121,13 +180,14 @@ class Record:
         Raises:
             NoteValueError: If the new note is empty or the old note is not found.
         """
-        for i, note in enumerate(self.notes):
-            if note.name == old_name:
-                if not new_note:
-                    raise NoteValueError("Note cannot be empty")
-                self.notes[i] = Note(new_note, note.name)
-                return
-        raise NoteValueError("Note with the given name not found")
+        note = self._notes_by_name.get(old_name)
+        if note is None:
+            raise NoteValueError("Note with the given name not found")
+        replacement = Note(new_note, old_name)
+        # Notes compare by identity, so index() finds this exact note
+        self.notes[self.notes.index(note)] = replacement
+        self._notes_by_name[old_name] = replacement
+        Record.notes_version += 1
 
     def remove_note_by_name(self, name: str) -> None:
         """
@@ -139,16 +199,44 @@ class Record:
         Raises:
             NoteValueError: If no note with the given name is found.
         """
-        for i, existing_note in enumerate(self.notes):
-            if existing_note.name == name:
-                del self.notes[i]
-                return
+        note = self._notes_by_name.get(name)
+        if note is None:
+            raise NoteValueError(f"Note with the name '{name}' not found")
+        self.notes.remove(note)
+        next_note = self._find_note_in_list(name)
+        if next_note is None:
+            del self._notes_by_name[name]
+        else:
+            self._notes_by_name[name] = next_note
+        Record.notes_version += 1
+
+    def find_note(self, name: str) -> Note | None:
+        """
+        Finds a note in the record by name.
 
-        raise NoteValueError(f"Note with the name '{name}' not found")
+        Args:
+            name (str): The name of the note to find.
+
+        Returns:
+            Note: The first note with the given name if found, or None.
+        """
+        return self._notes_by_name.get(name)
+
+    def _find_note_in_list(self, name: str) -> Note | None:
+        """
+        Finds the first note with the given name by scanning the notes.
+
+        Args:
+            name (str): The name of the note to find.
+
+        Returns:
+            Note: The note if found, or None.
+        """
+        return next((note for note in self.notes if note.name == name), None)
 
     def find_note_by_keyword(self, keyword: str) -> list:
         """
-        Finds notes containing a specific keyword.
+        Finds notes containing a specific keyword, ignoring case.
 
         Args:
             keyword (str): The keyword to search for in the notes.
@@ -156,7 +244,8 @@ class Record:
         Returns:
             list: A list of notes that contain the keyword.
         """
-        return [note for note in self.notes if keyword in note.value]
+        keyword = keyword.casefold()
+        return [note for note in self.notes if keyword in note.casefolded]
 
     def add_email(self, email: str) -> None:
         """
@@ -166,6 +255,7 @@ class Record:
             email (str): The email to add.
         """
         self.email = Email(email)
+        self._cached_str = None
 
     def add_address(self, address: str) -> None:
         """
@@ -175,6 +265,80 @@ class Record:
             address (str): The address to add.
         """
         self.address = Address(" ".join(address))
+        self._cached_str = None
+
+    def to_dict(self) -> dict:
+        """
+        Converts the record into a dictionary of plain values for storage.
+
+        Returns:
+            dict: The record data.
+        """
+        return {
+            "name": self.name.value,
+            "phones": [phone.value for phone in self.phones],
+            "birthday": str(self.birthday) if self.birthday else None,
+            "email": self.email.value if self.email else None,
+            "address": self.address.value if self.address else None,
+            "notes": [
+                {"name": note.name, "value": note.value, "tags": note.sorted_tags()}
+                for note in self.notes
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Record":
+        """
+        Creates a record from a dictionary produced by `to_dict`.
+
+        Args:
+            data (dict): The record data.
+
+        Returns:
+            Record: The restored record.
+        """
+        birthday = data["birthday"]
+        record = cls.__new__(cls)
+        # Stored values are restored as they are, without the input checks,
+        # so books saved under older validation rules still load
+        record.__setstate__(
+            {
+                "name": Name.restore(data["name"]),
+                "phones": [Phone.restore(phone) for phone in data["phones"]],
+                "birthday": (
+                    Birthday.restore(Birthday.convert_str_to_date(birthday))
+                    if birthday
+                    else None
+                ),
+                "email": Email.restore(data["email"]) if data["email"] else None,
+                "address": (
+                    Address.restore(data["address"]) if data["address"] else None
+                ),
+                "notes": [
+                    Note.restore(note["value"], name=note["name"], tags=note["tags"])
+                    for note in data["notes"]
+                ],
+            }
+        )
+        return record
+
+    def __setstate__(self, state: dict | tuple) -> None:
+        """
+        Restores the record from pickled attributes, including records pickled
+        before the class defined __slots__.
+
+        Args:
+            state (dict | tuple): The pickled state.
+        """
+        self._cached_str = self._phones_str = None
+        set_pickled_state(self, state)
+        # Older pickles have no lookup indexes, rebuild them from the lists
+        self._phone_index = {}
+        for phone in self.phones:
+            self._phone_index.setdefault(phone.value, phone)
+        self._notes_by_name = {}
+        for note in self.notes:
+            self._notes_by_name.setdefault(note.name, note)
 
     def __str__(self) -> str:
         """
@@ -183,9 +347,12 @@ class Record:
         Returns:
             str: The string representation of the record.
         """
-        phone_list = "; ".join(p.value for p in self.phones)
-        birthday_str = f" {self.birthday}" if self.birthday else ""
-        email_str = f" {self.email}" if self.email else "-"
-        address_str = f" {self.address}" if self.address else "-"
-        return f"Contact name: {self.name.value:<10}| phones: {phone_list:<10}| \
-birthday: {birthday_str:<12}| email: {email_str:<10}| address: {address_str:<10}"
+        if self._cached_str is None:
+            phone_list = self.format_phones()
+            birthday_str = f" {self.birthday}" if self.birthday else ""
+            email_str = f" {self.email}" if self.email else "-"
+            address_str = f" {self.address}" if self.address else "-"
+            self._cached_str = f"Contact name: {self.name.value:<10}| \
+phones: {phone_list:<10}| birthday: {birthday_str:<12}| email: {email_str:<10}| \
+address: {address_str:<10}"
+        return self._cached_str